@@ -6,12 +6,23 @@ from typing import List
 
 from utils.tle_parser import parse_tle, parse_tle_lines
 from utils.anomalies import solve_true_anomaly
-from utils.time_utils import parse_epoch, build_time_array
-from utils.propagate import propagate_kepler
+from utils.time_utils import parse_epoch, build_time_array, build_time_seconds
+from utils.propagate import propagate_kepler, mean_motion_revday_to_rad_s
 from plots.earth_3d import build_3d_earth_orbit
 
 st.set_page_config(page_title="Satellite Orbit Visualizer", layout="wide")
 
+# TLE parsing is pure; cache on the raw text / lines so widget reruns skip it
+_parse_tle_lines_cached = st.cache_data(max_entries=32)(parse_tle_lines)
+_parse_tle_cached = st.cache_data(max_entries=32)(parse_tle)
+_parse_epoch_cached = st.cache_data(max_entries=32)(parse_epoch)
+
+@st.cache_data(max_entries=16)
+def _propagate_cached(sma, ecc, inc, raan, argp, M0, n, numdays, step, use_lut, dtype):
+    """Propagate once per (elements, span, step); reruns with the same inputs hit the cache."""
+    times_seconds = build_time_seconds(numdays, step)
+    return propagate_kepler(sma, ecc, inc, raan, argp, M0, n, times_seconds, use_lut=use_lut, dtype=dtype)
+
 # Basic CSS for minimal dark theme
 st.markdown("""
     <style>
@@ -60,7 +71,7 @@ if not tle_text or tle_text.strip() == "":
     st.stop()
 
 # Accept multiple satellites; parse first if multiple
-triples = parse_tle_lines(tle_text)
+triples = _parse_tle_lines_cached(tle_text)
 if len(triples) == 0:
     st.error("No valid TLE found. Ensure lines start with '1 ' and '2 '.")
     st.stop()
@@ -75,7 +86,7 @@ else:
     name, l1, l2 = triples[0]
 
 # Parse the single TLE
-data = parse_tle(l1, l2)
+data = _parse_tle_cached(l1, l2)
 
 # extract values
 inc_deg = data["inclination"]
@@ -86,15 +97,15 @@ mean_anom_deg = data["mean_anom"]
 mean_motion = data["mean_motion_rev_per_day"]
 sma_km = data["sma_km"]
 
-epoch_dt = parse_epoch(data["epoch_year"], data["epoch_day"])
+epoch_dt = _parse_epoch_cached(data["epoch_year"], data["epoch_day"])
 now_dt = datetime.now(timezone.utc)
 delta_t_sec = (now_dt - epoch_dt).total_seconds()
 
 # advance mean anomaly and compute true anomaly (like MATLAB)
 # mean motion rad/s:
-n_rad_s = mean_motion * 2.0 * math.pi / 86400.0
+n_rad_s = mean_motion_revday_to_rad_s(mean_motion)
 M0_rad = math.radians(mean_anom_deg)
-M_now = (M0_rad + n_rad_s * delta_t_sec) % (2.0 * math.pi)
+M_now = (M0_rad + n_rad_s * delta_t_sec) % math.tau
 # solve for true anomaly
 # using anomalies.newtonm but we can just compute solve_true_anomaly (which uses M degrees)
 true_anom_deg_now = solve_true_anomaly(ecc, math.degrees(M_now))
@@ -126,12 +137,15 @@ if debug:
 # Visualization: compute positions using Keplerian propagator
 if do_visualize:
     st.subheader("3D Keplerian Visualization")
-    # build times seconds array from 0 -> numdays*86400 step sample_seconds
-    total_seconds = int(numdays * 24 * 3600)
-    times_seconds = list(range(0, total_seconds+1, int(sample_seconds)))
-    xs, ys, zs = propagate_kepler(sma_km, ecc, inc_deg, raan_deg, argp_deg, mean_anom_deg, mean_motion, times_seconds)
+    # propagate from 0 -> numdays*86400 step sample_seconds
+    # below e = 0.1 the compiled exact solve (series starter + 2 Newton steps) beats
+    # the lookup table; the table only pays off for moderately eccentric orbits
+    use_lut = 0.1 <= ecc <= 0.3 and not debug
+    # the globe is drawn from float32 anyway; keep full precision when debugging
+    positions = _propagate_cached(sma_km, ecc, inc_deg, raan_deg, argp_deg, mean_anom_deg, mean_motion,
+                                  numdays, sample_seconds, use_lut, "float64" if debug else "float32")
     
     # Use premium Three.js visualization by default
-    build_3d_earth_orbit(xs, ys, zs, sat_name=name, premium=True)
+    build_3d_earth_orbit(positions, sat_name=name, premium=True)
 
 
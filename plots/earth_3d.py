@@ -1,17 +1,35 @@
 # plots/earth_3d.py
-import plotly.graph_objects as go
 import numpy as np
 import streamlit as st
 import streamlit.components.v1 as components
 from .colors import BG, TEXT, PRIMARY_ACCENT
-import json
+import base64
+import math
+import os
 
-def build_3d_earth_orbit(xs, ys, zs, sat_name="satellite", animate=False, frame_count=100, premium=True):
+# three.js build used by the premium view when static/three.min.js is not bundled
+THREE_CDN_URL = "https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js"
+# Bundled copy under the app root, served by Streamlit static serving when present
+_LOCAL_THREE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 "static", "three.min.js")
+_LOCAL_THREE_URL = "app/static/three.min.js"
+
+# Upper bound on orbit samples sent to the browser; a canvas cannot resolve more
+MAX_DISPLAY_POINTS = 20000
+
+# Earth sphere mesh for the Plotly view, built once at import
+_EARTH_RADIUS_KM = 6371.0
+_TH, _PH = np.meshgrid(np.linspace(0, 2*np.pi, 80), np.linspace(0, np.pi, 40))
+_SPH_X = _EARTH_RADIUS_KM * np.cos(_TH) * np.sin(_PH)
+_SPH_Y = _EARTH_RADIUS_KM * np.sin(_TH) * np.sin(_PH)
+_SPH_Z = _EARTH_RADIUS_KM * np.cos(_PH)
+
+def build_3d_earth_orbit(positions, sat_name="satellite", animate=False, frame_count=100, premium=True):
     """
     Build 3D Earth orbit visualization.
     
     Args:
-        xs, ys, zs: Orbit coordinates
+        positions: (N, 3) array of orbit coordinates (km)
         sat_name: Satellite name
         animate: Animation flag (for future use)
         frame_count: Animation frames
@@ -22,24 +40,20 @@ def build_3d_earth_orbit(xs, ys, zs, sat_name="satellite", animate=False, frame_
     """
     
     if premium:
-        return build_premium_earth_visualization(xs, ys, zs, sat_name)
+        return build_premium_earth_visualization(positions, sat_name)
     else:
-        return build_plotly_earth_orbit(xs, ys, zs, sat_name)
+        return build_plotly_earth_orbit(positions, sat_name)
 
-def build_plotly_earth_orbit(xs, ys, zs, sat_name="satellite"):
+def build_plotly_earth_orbit(positions, sat_name="satellite"):
     """Legacy Plotly-based Earth visualization."""
-    # Earth mesh
-    radius = 6371.0
-    theta = np.linspace(0, 2*np.pi, 80)
-    phi = np.linspace(0, np.pi, 40)
-    th, ph = np.meshgrid(theta, phi)
-    X = radius * np.cos(th) * np.sin(ph)
-    Y = radius * np.sin(th) * np.sin(ph)
-    Z = radius * np.cos(ph)
+    # imported here so the default premium path never pays for loading plotly
+    import plotly.graph_objects as go
 
+    xs, ys, zs = positions[:, 0], positions[:, 1], positions[:, 2]
     fig = go.Figure()
 
-    fig.add_trace(go.Surface(x=X, y=Y, z=Z, colorscale='Blues',
+    # Earth mesh (precomputed at import)
+    fig.add_trace(go.Surface(x=_SPH_X, y=_SPH_Y, z=_SPH_Z, colorscale='Blues',
                              showscale=False, opacity=0.9, hoverinfo='skip', name='Earth'))
 
     # orbit line
@@ -57,39 +71,57 @@ def build_plotly_earth_orbit(xs, ys, zs, sat_name="satellite"):
                       margin=dict(l=0, r=0, t=30, b=0))
     return fig
 
-def build_premium_earth_visualization(xs, ys, zs, sat_name="satellite"):
+def build_premium_earth_visualization(positions, sat_name="satellite"):
     """
     Premium Earth with realistic textures from Three.js examples (CDN-hosted).
     Uses WebGL for photorealistic rendering with atmosphere and lighting.
     """
     
     # Validate input data
-    if not xs or not ys or not zs:
-        st.error("No orbit data available. Please ensure the satellite propagation generated valid coordinates.")
+    positions = np.asarray(positions)
+    if positions.ndim != 2 or positions.shape[1] != 3:
+        st.error("Orbit positions must be an (N, 3) coordinate array.")
         return
     
-    if len(xs) != len(ys) or len(ys) != len(zs):
-        st.error("Coordinate arrays have mismatched lengths.")
+    if len(positions) == 0:
+        st.error("No orbit data available. Please ensure the satellite propagation generated valid coordinates.")
         return
     
-    # Convert orbit data to JSON - scale down from km to viewing units
-    xs_scaled = [x / 1000.0 for x in xs]
-    ys_scaled = [y / 1000.0 for y in ys]
-    zs_scaled = [z / 1000.0 for z in zs]
+    # checked per render so copying the file in takes effect without a restart
+    three_src = _LOCAL_THREE_URL if os.path.exists(_LOCAL_THREE_PATH) else THREE_CDN_URL
+    html_code = build_premium_html(positions, sat_name, three_src)
+    components.html(html_code, height=800)
+
+@st.cache_data(max_entries=16)
+def build_premium_html(positions, sat_name="satellite", three_src=THREE_CDN_URL):
+    """
+    Render the Three.js page for an (N, 3) orbit array (km), loading three.js from three_src.
+    Cached by Streamlit on the array contents, name and script URL, so reruns
+    with the same orbit reuse the HTML string.
+    """
+    # Thin to at most MAX_DISPLAY_POINTS by uniform stride (display only;
+    # the caller keeps the full-resolution array)
+    stride = max(1, math.ceil(len(positions) / MAX_DISPLAY_POINTS))
+    positions = positions[::stride]
     
-    xs_json = json.dumps(xs_scaled)
-    ys_json = json.dumps(ys_scaled)
-    zs_json = json.dumps(zs_scaled)
+    # Down-cast at the display boundary (no copy if propagate_kepler already gave float32), scale
+    # from km to viewing units in float32 and ship as raw little-endian bytes;
+    # the browser decodes straight into a Float32Array (exactly 4 bytes/coord)
+    pos_scaled = positions.astype("<f4", copy=False) * np.float32(1e-3)
+    positions_b64 = base64.b64encode(pos_scaled.tobytes()).decode("ascii")
     
-    # Build the orbit data script separately (not in f-string to avoid brace conflicts)
-    orbit_data_js = f"""
-            // ===== ORBIT DATA =====
-            const orbitXs = {xs_json};
-            const orbitYs = {ys_json};
-            const orbitZs = {zs_json};
-    """
+    html_code = (_PREMIUM_HTML_TEMPLATE
+                 .replace("__THREE_SRC__", three_src)
+                 .replace("__SAT_NAME__", sat_name)
+                 # the large payload goes in last so it is copied only once
+                 .replace("__ORBIT_B64__", positions_b64))
     
-    html_code = f"""
+    return html_code
+
+
+# Three.js page for the premium view. Plain string (not an f-string) so the
+# JS/CSS braces need no escaping; build_premium_html fills the __NAME__ placeholders.
+_PREMIUM_HTML_TEMPLATE = """
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -97,28 +129,28 @@ def build_premium_earth_visualization(xs, ys, zs, sat_name="satellite"):
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>Premium Earth Orbit Visualizer</title>
         <style>
-            body {{ margin: 0; overflow: hidden; background: #000000; font-family: Arial, sans-serif; }}
-            canvas {{ display: block; width: 100%; height: 100%; }}
-            #info {{ 
+            body { margin: 0; overflow: hidden; background: #000000; font-family: Arial, sans-serif; }
+            canvas { display: block; width: 100%; height: 100%; }
+            #info { 
                 position: absolute; top: 20px; left: 20px; color: #fff; 
                 font-family: monospace; font-size: 13px; background: rgba(0, 0, 0, 0.85);
                 padding: 15px 20px; border-radius: 8px; z-index: 10; border: 1px solid #4db8ff;
-            }}
-            #coordinates {{
+            }
+            #coordinates {
                 position: absolute; top: 20px; right: 20px; color: #fff;
                 font-family: monospace; font-size: 12px; background: rgba(0, 0, 0, 0.85);
                 padding: 15px 20px; border-radius: 8px; z-index: 10; border: 1px solid #ff6b6b;
-            }}
-            #info div {{ margin: 5px 0; }}
-            .label {{ color: #888; }}
-            .value {{ color: #4db8ff; font-weight: bold; }}
-            .coord-label {{ color: #ff6b6b; }}
-            .coord-value {{ color: #00ff00; font-weight: bold; }}
+            }
+            #info div { margin: 5px 0; }
+            .label { color: #888; }
+            .value { color: #4db8ff; font-weight: bold; }
+            .coord-label { color: #ff6b6b; }
+            .coord-value { color: #00ff00; font-weight: bold; }
         </style>
     </head>
     <body>
         <div id="info">
-            <div><strong style="color: #fff; font-size: 14px;">{sat_name}</strong></div>
+            <div><strong style="color: #fff; font-size: 14px;">__SAT_NAME__</strong></div>
             <div><span class="label">Orbit Points:</span> <span class="value" id="pointCount">0</span></div>
             <div style="margin-top: 10px; border-top: 1px solid #333; padding-top: 10px; font-size: 12px; color: #aaa;">
                 <div>🖱️  Drag to rotate</div>
@@ -134,7 +166,8 @@ def build_premium_earth_visualization(xs, ys, zs, sat_name="satellite"):
                 <div><span class="coord-label">Alt:</span> <span class="coord-value" id="altitude">0.000</span> km</div>
             </div>
         </div>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js"></script>
+        <!-- static/three.min.js when bundled, otherwise the CDN build -->
+        <script src="__THREE_SRC__"></script>
         <script>
             // ===== SETUP =====
             const scene = new THREE.Scene();
@@ -145,18 +178,19 @@ def build_premium_earth_visualization(xs, ys, zs, sat_name="satellite"):
             const starCount = 2000;
             const starPositions = new Float32Array(starCount * 3);
             
-            for (let i = 0; i < starCount * 3; i += 3) {{
-                starPositions[i] = (Math.random() - 0.5) * 500;     // X
-                starPositions[i + 1] = (Math.random() - 0.5) * 500; // Y
-                starPositions[i + 2] = (Math.random() - 0.5) * 500; // Z
-            }}
+            // One batched RNG fill for all x,y,z components
+            const starRand = new Uint32Array(starCount * 3);
+            crypto.getRandomValues(starRand);
+            for (let i = 0; i < starCount * 3; i++) {
+                starPositions[i] = (starRand[i] / 0xffffffff - 0.5) * 500;
+            }
             
             starGeometry.setAttribute('position', new THREE.BufferAttribute(starPositions, 3));
-            const starMaterial = new THREE.PointsMaterial({{
+            const starMaterial = new THREE.PointsMaterial({
                 color: 0xffffff,
                 size: 0.3,
                 sizeAttenuation: true
-            }});
+            });
             const stars = new THREE.Points(starGeometry, starMaterial);
             scene.add(stars);
             
@@ -169,44 +203,53 @@ def build_premium_earth_visualization(xs, ys, zs, sat_name="satellite"):
             camera.position.set(0, 8, 12);
             camera.lookAt(0, 0, 0);
             
-            const renderer = new THREE.WebGLRenderer({{ antialias: true }});
+            const renderer = new THREE.WebGLRenderer({ antialias: true });
             renderer.setSize(window.innerWidth, window.innerHeight);
             renderer.setPixelRatio(window.devicePixelRatio);
             renderer.outputColorSpace = THREE.SRGBColorSpace;
             document.body.appendChild(renderer.domElement);
 
             // ===== RESPONSIVE =====
-            window.addEventListener('resize', () => {{
+            window.addEventListener('resize', () => {
                 camera.aspect = window.innerWidth / window.innerHeight;
                 camera.updateProjectionMatrix();
                 renderer.setSize(window.innerWidth, window.innerHeight);
-            }});
+            });
 
             // ===== MOUSE DRAG =====
             let isDragging = false;
-            let previousMouse = {{ x: 0, y: 0 }};
-            let cameraRotation = {{ x: 0, y: 0 }};
+            let previousMouse = { x: 0, y: 0 };
+            let cameraRotation = { x: 0, y: 0 };
+            let cameraDirty = true; // camera needs a full rebuild from cameraRotation
             
-            document.addEventListener('mousedown', (e) => {{ isDragging = true; }});
-            document.addEventListener('mousemove', (e) => {{
-                if (isDragging) {{
+            document.addEventListener('mousedown', (e) => { isDragging = true; });
+            document.addEventListener('mousemove', (e) => {
+                if (isDragging) {
                     const deltaX = e.clientX - previousMouse.x;
                     const deltaY = e.clientY - previousMouse.y;
                     cameraRotation.y += deltaX * 0.008;
                     cameraRotation.x += deltaY * 0.008;
-                }}
-                previousMouse = {{ x: e.clientX, y: e.clientY }};
-            }});
-            document.addEventListener('mouseup', () => {{ isDragging = false; }});
+                    cameraDirty = true;
+                }
+                previousMouse = { x: e.clientX, y: e.clientY };
+            });
+            document.addEventListener('mouseup', () => { isDragging = false; });
 
             // ===== ZOOM =====
-            document.addEventListener('wheel', (e) => {{
+            document.addEventListener('wheel', (e) => {
                 e.preventDefault();
                 const currentDist = camera.position.length();
                 const newDist = Math.max(5, Math.min(200, currentDist + e.deltaY * 0.05));
                 const direction = camera.position.clone().normalize();
                 camera.position.copy(direction.multiplyScalar(newDist));
-            }}, {{ passive: false }});
+                
+                // Swap in the detailed Earth mesh the first time the camera gets close
+                if (newDist < earthHiLodDist && !earthHiLod) {
+                    earthHiLod = true;
+                    earth.geometry.dispose();
+                    earth.geometry = new THREE.SphereGeometry(6.371, 256, 256);
+                }
+            }, { passive: false });
 
             // ===== LOAD TEXTURES FROM CDN =====
             const loader = new THREE.TextureLoader();
@@ -223,7 +266,7 @@ def build_premium_earth_visualization(xs, ys, zs, sat_name="satellite"):
             // Load day map
             loader.load(
                 earthDayUrl,
-                (texture) => {{
+                (texture) => {
                     earthDayTex = texture;
                     texture.generateMipmaps = true;
                     texture.magFilter = THREE.LinearFilter;
@@ -231,17 +274,17 @@ def build_premium_earth_visualization(xs, ys, zs, sat_name="satellite"):
                     texturesLoaded++;
                     console.log('Day texture loaded');
                     updateEarthMaterial();
-                }},
+                },
                 undefined,
-                (err) => {{
+                (err) => {
                     console.error('Failed to load day texture:', err);
-                }}
+                }
             );
             
             // Load night map
             loader.load(
                 earthNightUrl,
-                (texture) => {{
+                (texture) => {
                     earthNightTex = texture;
                     texture.generateMipmaps = true;
                     texture.magFilter = THREE.LinearFilter;
@@ -249,74 +292,77 @@ def build_premium_earth_visualization(xs, ys, zs, sat_name="satellite"):
                     texturesLoaded++;
                     console.log('Night texture loaded');
                     updateEarthMaterial();
-                }},
+                },
                 undefined,
-                (err) => {{
+                (err) => {
                     console.error('Failed to load night texture:', err);
-                }}
+                }
             );
 
             // ===== CREATE EARTH =====
-            const earthGeo = new THREE.SphereGeometry(6.371, 256, 256);
-            const earthMat = new THREE.MeshPhongMaterial({{
+            // Low-detail mesh by default; the zoom handler upgrades it when close
+            const earthHiLodDist = 15;
+            let earthHiLod = false;
+            const earthGeo = new THREE.SphereGeometry(6.371, 64, 64);
+            const earthMat = new THREE.MeshPhongMaterial({
                 color: 0xffffff,
                 shininess: 15,
                 wireframe: false
-            }});
+            });
             const earth = new THREE.Mesh(earthGeo, earthMat);
             earth.rotation.z = THREE.MathUtils.degToRad(23.4);
             scene.add(earth);
             
             // Update material once textures load
-            function updateEarthMaterial() {{
-                if (earthDayTex) {{
+            function updateEarthMaterial() {
+                if (earthDayTex) {
                     earth.material.map = earthDayTex;
                     earth.material.needsUpdate = true;
-                }}
-                if (earthNightTex) {{
+                }
+                if (earthNightTex) {
                     earth.material.emissiveMap = earthNightTex;
                     earth.material.emissive = new THREE.Color(0x111111);
                     earth.material.emissiveIntensity = 0.5;
                     earth.material.needsUpdate = true;
-                }}
-            }}
+                }
+            }
 
             // ===== CREATE CLOUDS =====
-            const cloudGeo = new THREE.SphereGeometry(6.39, 128, 128);
-            const cloudMat = new THREE.MeshPhongMaterial({{
+            const cloudGeo = new THREE.SphereGeometry(6.39, 64, 64);
+            const cloudMat = new THREE.MeshPhongMaterial({
                 color: 0xffffff,
                 transparent: true,
                 opacity: 0.15,
                 depthWrite: false,
                 emissive: new THREE.Color(0x999999)
-            }});
+            });
             const clouds = new THREE.Mesh(cloudGeo, cloudMat);
             clouds.rotation.z = earth.rotation.z;
             scene.add(clouds);
 
             // ===== CREATE ATMOSPHERE =====
             const atmGeo = new THREE.SphereGeometry(6.50, 64, 64);
-            const atmMat = new THREE.ShaderMaterial({{
-                uniforms: {{}},
+            const atmMat = new THREE.ShaderMaterial({
+                uniforms: {},
                 vertexShader: `
                     varying vec3 vNormal;
-                    void main() {{
+                    void main() {
                         vNormal = normalize(normalMatrix * normal);
                         gl_Position = projectionMatrix * modelViewMatrix * vec4(position, 1.0);
-                    }}
+                    }
                 `,
                 fragmentShader: `
                     varying vec3 vNormal;
-                    void main() {{
+                    void main() {
                         float intensity = pow(0.6 - dot(vNormal, vec3(0.0, 0.0, 1.0)), 4.0);
                         gl_FragColor = vec4(0.2, 0.6, 1.0, 0.3) * intensity;
-                    }}
+                    }
                 `,
                 blending: THREE.AdditiveBlending,
                 side: THREE.BackSide,
                 transparent: true,
                 depthWrite: false
-            }});
+            });
             const atmosphere = new THREE.Mesh(atmGeo, atmMat);
             scene.add(atmosphere);
 
@@ -327,25 +373,24 @@ def build_premium_earth_visualization(xs, ys, zs, sat_name="satellite"):
 
             const ambLight = new THREE.AmbientLight(0x505050);
             scene.add(ambLight);
-"""
-    
-    # Append the orbit data (which uses different f-string to handle JSON braces)
-    html_code += orbit_data_js + f"""
-            
-            document.getElementById('pointCount').textContent = orbitXs.length;
+
+            // ===== ORBIT DATA (base64 float32, flat x,y,z triplets) =====
+            const orbitB64 = "__ORBIT_B64__";
+            const orbitBin = atob(orbitB64);
+            const orbitBytes = new Uint8Array(orbitBin.length);
+            for (let i = 0; i < orbitBin.length; i++) {
+                orbitBytes[i] = orbitBin.charCodeAt(i);
+            }
+            const orbitPositions = new Float32Array(orbitBytes.buffer);
+            const orbitCount = orbitPositions.length / 3;
+
+            document.getElementById('pointCount').textContent = orbitCount;
 
             // ===== CREATE ORBIT LINE =====
-            const orbitPoints = [];
-            for (let i = 0; i < orbitXs.length; i++) {{
-                orbitPoints.push(new THREE.Vector3(orbitXs[i], orbitYs[i], orbitZs[i]));
-            }}
-
-            const orbitGeo = new THREE.BufferGeometry().setFromPoints(orbitPoints);
-            const orbitMat = new THREE.LineBasicMaterial({{ 
-                color: 0x4db8ff,
-                linewidth: 2,
-                transparent: false
-            }});
+            const orbitGeo = new THREE.BufferGeometry();
+            orbitGeo.setAttribute('position', new THREE.BufferAttribute(orbitPositions, 3));
+            // Plain 1px line strip: WebGL ignores linewidth on most platforms anyway
+            const orbitMat = new THREE.LineBasicMaterial({ color: 0x4db8ff });
             const orbitLine = new THREE.Line(orbitGeo, orbitMat);
             scene.add(orbitLine);
 
@@ -354,22 +399,22 @@ def build_premium_earth_visualization(xs, ys, zs, sat_name="satellite"):
             
             // Main body (rectangular box)
             const bodyGeo = new THREE.BoxGeometry(0.4, 0.3, 0.25);
-            const bodyMat = new THREE.MeshPhongMaterial({{ 
+            const bodyMat = new THREE.MeshPhongMaterial({ 
                 color: 0xcccccc,
                 shininess: 80,
                 metalness: 0.8
-            }});
+            });
             const body = new THREE.Mesh(bodyGeo, bodyMat);
             satelliteGroup.add(body);
             
             // Solar panels (two large flat rectangles)
             const panelGeo = new THREE.PlaneGeometry(0.6, 0.2);
-            const panelMat = new THREE.MeshPhongMaterial({{ 
+            const panelMat = new THREE.MeshPhongMaterial({ 
                 color: 0x1a4d99,
                 side: THREE.DoubleSide,
                 shininess: 40,
                 emissive: 0x001a33
-            }});
+            });
             
             const leftPanel = new THREE.Mesh(panelGeo, panelMat);
             leftPanel.position.set(-0.35, 0.15, 0);
@@ -383,14 +428,14 @@ def build_premium_earth_visualization(xs, ys, zs, sat_name="satellite"):
             
             // Antenna (thin cylinder)
             const antennaGeo = new THREE.CylinderGeometry(0.02, 0.02, 0.3);
-            const antennaMat = new THREE.MeshPhongMaterial({{ color: 0x888888 }});
+            const antennaMat = new THREE.MeshPhongMaterial({ color: 0x888888 });
             const antenna = new THREE.Mesh(antennaGeo, antennaMat);
             antenna.position.set(0, 0.25, 0);
             satelliteGroup.add(antenna);
             
             // Dish antenna (small cone)
             const dishGeo = new THREE.ConeGeometry(0.08, 0.12, 16);
-            const dishMat = new THREE.MeshPhongMaterial({{ color: 0xffaa00 }});
+            const dishMat = new THREE.MeshPhongMaterial({ color: 0xffaa00 });
             const dish = new THREE.Mesh(dishGeo, dishMat);
             dish.position.set(0, -0.2, 0);
             dish.rotation.z = Math.PI;
@@ -399,29 +444,41 @@ def build_premium_earth_visualization(xs, ys, zs, sat_name="satellite"):
             scene.add(satelliteGroup);
 
             // Position satellite at first point
-            if (orbitPoints.length > 0) {{
-                satelliteGroup.position.copy(orbitPoints[0]);
-            }}
+            if (orbitCount > 0) {
+                satelliteGroup.position.set(orbitPositions[0], orbitPositions[1], orbitPositions[2]);
+            }
 
             // ===== ANIMATION =====
             let pointIndex = 0;
             let frameCounter = 0;
             const movementSpeed = 10; // Move every N frames (slower movement)
             
-            function animate() {{
+            // Idle spin about the Y axis by a fixed step; cos/sin computed once
+            const idleSpin = 0.0003;
+            const idleSpinCos = Math.cos(idleSpin);
+            const idleSpinSin = Math.sin(idleSpin);
+            const _scratchVec = new THREE.Vector3();
+            
+            function animate() {
                 requestAnimationFrame(animate);
 
                 // Update camera rotation
-                const distance = camera.position.length();
-                
-                if (!isDragging) {{
-                    cameraRotation.y += 0.0003;
-                }}
-                
-                const radius = Math.sqrt(camera.position.x * camera.position.x + camera.position.z * camera.position.z);
-                camera.position.x = radius * Math.sin(cameraRotation.y);
-                camera.position.z = radius * Math.cos(cameraRotation.y);
-                camera.position.y = distance * Math.sin(cameraRotation.x);
+                if (cameraDirty) {
+                    // Full rebuild only after the user has dragged
+                    const distance = camera.position.length();
+                    const radius = Math.sqrt(camera.position.x * camera.position.x + camera.position.z * camera.position.z);
+                    camera.position.x = radius * Math.sin(cameraRotation.y);
+                    camera.position.z = radius * Math.cos(cameraRotation.y);
+                    camera.position.y = distance * Math.sin(cameraRotation.x);
+                    cameraDirty = false;
+                } else if (!isDragging) {
+                    // x' = x cos + z sin, z' = z cos - x sin
+                    const camX = camera.position.x;
+                    const camZ = camera.position.z;
+                    camera.position.x = camX * idleSpinCos + camZ * idleSpinSin;
+                    camera.position.z = camZ * idleSpinCos - camX * idleSpinSin;
+                    cameraRotation.y += idleSpin;
+                }
                 
                 camera.lookAt(0, 0, 0);
 
@@ -430,16 +487,20 @@ def build_premium_earth_visualization(xs, ys, zs, sat_name="satellite"):
                 clouds.rotation.y += 0.00025;
 
                 // Animate satellite along orbit (slowed down)
-                if (orbitPoints.length > 0) {{
+                if (orbitCount > 0) {
                     frameCounter++;
-                    if (frameCounter >= movementSpeed) {{
+                    if (frameCounter >= movementSpeed) {
                         frameCounter = 0;
-                        pointIndex = (pointIndex + 1) % orbitPoints.length;
-                        satelliteGroup.position.copy(orbitPoints[pointIndex]);
+                        pointIndex = (pointIndex + 1) % orbitCount;
+                        satelliteGroup.position.set(
+                            orbitPositions[3*pointIndex],
+                            orbitPositions[3*pointIndex + 1],
+                            orbitPositions[3*pointIndex + 2]
+                        );
                         
                         // Point satellite toward Earth (at origin)
-                        const earthDir = new THREE.Vector3(0, 0, 0).sub(satelliteGroup.position).normalize();
-                        satelliteGroup.lookAt(satelliteGroup.position.clone().add(earthDir));
+                        _scratchVec.copy(satelliteGroup.position).negate().normalize().add(satelliteGroup.position);
+                        satelliteGroup.lookAt(_scratchVec);
                         
                         // Update coordinates display
                         const satX = satelliteGroup.position.x * 1000; // Convert back to km
@@ -451,16 +512,14 @@ def build_premium_earth_visualization(xs, ys, zs, sat_name="satellite"):
                         document.getElementById('coordY').textContent = satY.toFixed(3);
                         document.getElementById('coordZ').textContent = satZ.toFixed(3);
                         document.getElementById('altitude').textContent = altitude.toFixed(3);
-                    }}
-                }}
+                    }
+                }
 
                 renderer.render(scene, camera);
-            }}
+            }
 
             animate();
         </script>
     </body>
     </html>
     """
-    
-    components.html(html_code, height=800)
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# make the app's top-level packages (utils, plots) importable without installing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,39 @@
+# tests/test_anomalies.py
+import math
+
+import pytest
+
+from utils.anomalies import build_E_table, newtonm, solve_true_anomaly
+from utils.kepler_grid import grid_tables
+
+ECCS = [0.5, 0.9, 0.99]
+# unreduced mean anomalies (radians), both signs, up to 1e6
+MEAN_ANOMALIES = [0.0, 1.0, -2.5, 50.0, -321.7, 1.0e3 + 0.3, 1.0e5 + 2.0, -1.0e6 + 1.0, 1.0e6 + 3.0]
+
+
+@pytest.mark.parametrize("ecc", ECCS)
+@pytest.mark.parametrize("m", MEAN_ANOMALIES)
+def test_newtonm_converges_for_unreduced_m(ecc, m):
+    E, nu = newtonm(ecc, m)
+    # Kepler residual at the scale of |m| (float64 spacing near 1e6 is ~1e-10)
+    assert abs(E - ecc * math.sin(E) - m) <= 1e-12 * max(1.0, abs(m))
+    # same orbit position as the solve on the reduced anomaly
+    _, nu_ref = newtonm(ecc, math.remainder(m, 2.0 * math.pi))
+    assert abs(math.remainder(nu - nu_ref, 2.0 * math.pi)) < 1e-6
+
+
+@pytest.mark.parametrize("ecc", ECCS)
+@pytest.mark.parametrize("m", MEAN_ANOMALIES)
+def test_solve_true_anomaly_matches_reduced_input(ecc, m):
+    deg = solve_true_anomaly(ecc, math.degrees(m))
+    ref = math.degrees(newtonm(ecc, math.remainder(m, 2.0 * math.pi))[1])
+    assert -180.0 <= deg <= 180.0
+    assert abs(math.remainder(deg - ref, 360.0)) < 1e-4
+
+
+def test_cached_tables_are_read_only():
+    M_grid, E_grid = build_E_table(0.1)
+    SINE, COSE = grid_tables()
+    for arr in (M_grid, E_grid, SINE, COSE):
+        with pytest.raises(ValueError):
+            arr[0] = 0.0
@@ -0,0 +1,17 @@
+# tests/test_time_utils.py
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from utils.time_utils import build_time_array, build_time_seconds
+
+
+@pytest.mark.parametrize("step", [60, 2.5])
+def test_build_time_array_matches_build_time_seconds(step):
+    start = datetime(2025, 12, 10, 2, 57, 46, tzinfo=timezone.utc)
+    times = build_time_array(start, 0.5, step)
+    seconds = build_time_seconds(0.5, step)
+    assert times.dtype == np.dtype("datetime64[ns]")
+    assert times[0] == np.datetime64("2025-12-10T02:57:46", "ns")
+    np.testing.assert_array_equal((times - times[0]) / np.timedelta64(1, "s"), seconds)
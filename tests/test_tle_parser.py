@@ -0,0 +1,39 @@
+# tests/test_tle_parser.py
+import pytest
+
+from utils.tle_parser import TLE_DTYPE, parse_tle_lines, parse_tle_records
+
+L1 = "1 25544U 98067A   25344.12345678  .00016864  00000+0  10270-3 0  9002"
+L2 = "2 25544  51.6395  97.5833 0004293 178.5575 281.7121 15.50365241 38402"
+
+
+def test_parse_tle_records_keeps_long_names():
+    names = ["A VERY LONG SATELLITE NAME 000001", "A VERY LONG SATELLITE NAME 000002"]
+    text = "\n".join(f"{name}\n{L1}\n{L2}" for name in names)
+    recs = parse_tle_records(text)
+    assert recs["name"].tolist() == names
+    # short names keep the default layout
+    assert parse_tle_records(f"ISS (ZARYA)\n{L1}\n{L2}").dtype == TLE_DTYPE
+
+
+# (text, expected (name, line1, line2) triples); lines only need the "1 "/"2 " prefixes
+PARSE_LINES_CASES = [
+    ("NAME\n1 a\n2 b", [("NAME", "1 a", "2 b")]),
+    ("1 a\n2 b", [("SAT_1", "1 a", "2 b")]),
+    ("1 a\n2 b\nNAME\n1 c\n2 d", [("SAT_1", "1 a", "2 b"), ("NAME", "1 c", "2 d")]),
+    ("NAME\n\n  \n1 a\n\n2 b\n", [("NAME", "1 a", "2 b")]),
+    ("  NAME  \r\n1 a  \r\n2 b\r\n", [("NAME", "1 a", "2 b")]),
+    # stray line 2 with no line 1 before it is skipped
+    ("2 x\nNAME\n1 a\n2 b", [("NAME", "1 a", "2 b")]),
+    # stray line 1: the next line 1 wins and the stray one becomes the "name"
+    ("1 x\n1 a\n2 b", [("1 x", "1 a", "2 b")]),
+    # a line between line 1 and line 2 breaks the pair
+    ("NAME\n1 a\nJUNK\n2 b", []),
+    ("NAME\n1 a", []),
+    ("", []),
+]
+
+
+@pytest.mark.parametrize("text, expected", PARSE_LINES_CASES)
+def test_parse_tle_lines(text, expected):
+    assert parse_tle_lines(text) == expected
@@ -1,7 +1,12 @@
 # utils/anomalies.py
 import math
+from functools import lru_cache
 from typing import Tuple
 
+import numpy as np
+from numba import njit
+
+@njit(cache=True, fastmath=True)
 def newtonm(ecc: float, m: float) -> Tuple[float, float]:
     """
     Newton-Raphson to solve Kepler's equation and return (E, nu) in radians.
@@ -9,6 +14,7 @@ def newtonm(ecc: float, m: float) -> Tuple[float, float]:
     m: mean anomaly in radians
     returns: (E (eccentric anomaly), nu (true anomaly)) in radians
     Implements the algorithm similar to Vallado's newtonm.
+    JIT-compiled with numba (cached on disk so Streamlit reruns skip the compile).
     """
     numiter = 100
     small = 1e-8
@@ -17,33 +23,82 @@ def newtonm(ecc: float, m: float) -> Tuple[float, float]:
         # hyperbolic not expected for TLE; simple fallback
         E = m / (ecc - 1.0)
         # compute true anomaly roughly
-        nu = 2.0 * math.atan(math.sqrt((ecc + 1.0) / (ecc - 1.0)) * math.tanh(E/2.0))
+        nu = 2.0 * np.arctan(np.sqrt((ecc + 1.0) / (ecc - 1.0)) * np.tanh(E/2.0))
         return E, nu
 
     # elliptical / circular
-    # Initial guess
-    E = m if ecc < 0.8 else math.pi
+    # Initial guess (Danby's starter for high e; periodic in m, so m need not be reduced)
+    E = m if ecc < 0.8 else m + 0.85 * ecc * np.copysign(1.0, np.sin(m))
     for _ in range(numiter):
-        f = E - ecc * math.sin(E) - m
-        fp = 1 - ecc * math.cos(E)
+        f = E - ecc * np.sin(E) - m
+        fp = 1 - ecc * np.cos(E)
         dE = f / fp
         E = E - dE
         if abs(dE) < 1e-12:
             break
 
-    # true anomaly
-    sinv = math.sqrt(1.0 - ecc*ecc) * math.sin(E) / (1.0 - ecc * math.cos(E))
-    cosv = (math.cos(E) - ecc) / (1.0 - ecc * math.cos(E))
-    nu = math.atan2(sinv, cosv)
+    # true anomaly (the common 1 - e*cosE denominator cancels inside atan2)
+    nu = np.arctan2(np.sqrt(1.0 - ecc*ecc) * np.sin(E), np.cos(E) - ecc)
     return E, nu
 
 
+def eccentric_anomaly_vec(ecc: float, M: np.ndarray, tol: float = 1e-12, itmax: int = 30) -> np.ndarray:
+    """
+    Batch elliptical Kepler solve: E (radians) for an array of mean anomalies
+    sharing one eccentricity (ecc < 1).
+    All E values are updated in lock-step until the largest correction is below tol.
+    No true anomaly is formed; callers that only need E (tables, positions) skip the atan2.
+    """
+    M = np.asarray(M, dtype=np.float64)
+    # first-order seed E = M + e*sinM for low e saves about one iteration
+    E = np.where(ecc < 0.8, M + ecc * np.sin(M), M + 0.85 * ecc * np.copysign(1.0, np.sin(M)))
+    for _ in range(itmax):
+        dE = (E - ecc * np.sin(E) - M) / (1.0 - ecc * np.cos(E))
+        E -= dE
+        if np.max(np.abs(dE)) < tol:
+            break
+    return E
+
+
+@lru_cache(maxsize=16)
+def build_E_table(ecc: float, n: int = 4096) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lookup table of E(M) for one eccentricity on n uniformly spaced M in [0, 2pi).
+    Solved once with eccentric_anomaly_vec and cached per (ecc, n), so both
+    arrays are returned read-only.
+    returns: (M_grid, E_grid) in radians
+    """
+    M_grid = np.linspace(0.0, 2.0*np.pi, n, endpoint=False)
+    E_grid = eccentric_anomaly_vec(ecc, M_grid)
+    M_grid.setflags(write=False)
+    E_grid.setflags(write=False)
+    return M_grid, E_grid
+
+
+def solve_E_lut(M_array: np.ndarray, M_grid: np.ndarray, E_grid: np.ndarray) -> np.ndarray:
+    """
+    Eccentric anomaly by linear interpolation in a table from build_E_table.
+    Good enough for plotting low-eccentricity orbits, not for precise work.
+    """
+    M = np.asarray(M_array, dtype=np.float64) % (2.0*np.pi)
+    # E - M is 2pi-periodic, so interpolate that part to wrap past the last grid node
+    return M + np.interp(M, M_grid, E_grid - M_grid, period=2.0*np.pi)
+
+
+def _solve_true_anomaly_rad(ecc: float, M_rad: float) -> float:
+    """
+    Radians in, radians out; no unit conversion for internal callers.
+    """
+    _, nu = newtonm(ecc, M_rad)
+    return nu
+
+
 def solve_true_anomaly(ecc: float, M_deg: float) -> float:
     """
     Convenience: take mean anomaly in degrees, return true anomaly in degrees.
+    Degree wrapper for the UI; numeric code should use the radian solvers.
     """
-    M = math.radians(M_deg) % (2.0*math.pi)
-    _, nu = newtonm(ecc, M)
+    nu = _solve_true_anomaly_rad(ecc, math.radians(M_deg))
     # normalize same as MATLAB (-180,180]
     deg = math.degrees(nu)
     deg_wrapped = ((deg + 180.0) % 360.0) - 180.0
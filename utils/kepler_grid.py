@@ -0,0 +1,59 @@
+# utils/kepler_grid.py
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+from numba import njit
+
+from .anomalies import eccentric_anomaly_vec
+
+# Default grid (uniform in both axes): M over one full period (endpoint included so lookups wrap),
+# eccentricity over the near-circular range typical of TLE catalogs
+M_GRID = np.linspace(0.0, 2.0*np.pi, 1025)
+ECC_GRID = np.linspace(0.0, 0.3, 61)
+GRID_MAX_ECC = float(ECC_GRID[-1])
+
+def precompute_grid(M_grid: np.ndarray, e_grid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tables of sin E and cos E, shape (len(e_grid), len(M_grid)).
+    Kepler's equation is solved once per grid eccentricity with eccentric_anomaly_vec.
+    """
+    SINE = np.empty((len(e_grid), len(M_grid)))
+    COSE = np.empty((len(e_grid), len(M_grid)))
+    for k, ecc in enumerate(e_grid):
+        E = eccentric_anomaly_vec(float(ecc), M_grid)
+        SINE[k] = np.sin(E)
+        COSE[k] = np.cos(E)
+    return SINE, COSE
+
+@lru_cache(maxsize=1)
+def grid_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (SINE, COSE) for the default M_GRID x ECC_GRID, built on first use.
+    Shared by every caller, so the tables are returned read-only.
+    """
+    SINE, COSE = precompute_grid(M_GRID, ECC_GRID)
+    SINE.setflags(write=False)
+    COSE.setflags(write=False)
+    return SINE, COSE
+
+@njit(cache=True, fastmath=True, nogil=True)
+def grid_sincosE(SINE, COSE, M, e, m_scale, e0, e_scale):
+    """
+    Bilinear lookup of (sin E, cos E) in the tables from precompute_grid.
+    M in radians within the grid's M range, e within its eccentricity range;
+    m_scale and e_scale are cells per radian / per unit e, e0 the first grid e.
+    Accuracy is plotting-grade (~1e-5), not precise.
+    """
+    # both grids are uniform, so cell indices are a multiply + floor (no search)
+    uM = M * m_scale
+    ue = (e - e0) * e_scale
+    i = min(max(int(uM), 0), SINE.shape[1] - 2)
+    k = min(max(int(ue), 0), SINE.shape[0] - 2)
+    tM = uM - i
+    te = ue - k
+    s_lo = SINE[k, i] + tM * (SINE[k, i + 1] - SINE[k, i])
+    s_hi = SINE[k + 1, i] + tM * (SINE[k + 1, i + 1] - SINE[k + 1, i])
+    c_lo = COSE[k, i] + tM * (COSE[k, i + 1] - COSE[k, i])
+    c_hi = COSE[k + 1, i] + tM * (COSE[k + 1, i + 1] - COSE[k + 1, i])
+    return s_lo + te * (s_hi - s_lo), c_lo + te * (c_hi - c_lo)
@@ -1,66 +1,236 @@
 # utils/propagate.py
 import numpy as np
 import math
-from typing import Tuple, List
-from .anomalies import newtonm
+import threading
+from functools import lru_cache
+from numba import njit, prange
+from .anomalies import build_E_table, solve_E_lut
+from .kepler_grid import M_GRID, ECC_GRID, GRID_MAX_ECC, grid_tables, grid_sincosE
 
 MU = 398600.4418  # km^3/s^2
+_TWO_PI = math.tau
+_REVDAY_TO_RADS = _TWO_PI / 86400.0  # rev/day -> rad/s
+
+# propagate_many switches to grid-interpolated E above this many (satellite, epoch) samples
+GRID_THRESHOLD = 2_000_000
+# below this eccentricity the orbit is treated as circular (E = nu = M, r = a);
+# TLEs carry e to 1e-7, so in practice this only catches e == 0
+CIRCULAR_ECC = 1e-8
+# numba's fallback "workqueue" threading layer aborts the process on concurrent
+# entry into parallel kernels, so propagate_many runs them one call at a time
+_PARALLEL_LOCK = threading.Lock()
 
 def mean_motion_revday_to_rad_s(mean_motion_rev_per_day: float) -> float:
-    return mean_motion_rev_per_day * 2.0 * math.pi / 86400.0
+    return mean_motion_rev_per_day * _REVDAY_TO_RADS
 
-def kepler_to_eci(a_km: float, e: float, inc_deg: float, raan_deg: float, argp_deg: float, nu_rad: float) -> Tuple[float, float, float]:
+def kepler_to_eci(a_km: float, e: float, inc_deg: float, raan_deg: float, argp_deg: float, nu_rad):
     """
     Convert orbital elements and true anomaly (nu in radians) to ECI position (km).
+    nu_rad may be a scalar or a numpy array (positions are then arrays too).
     Perifocal position: [r cos nu, r sin nu, 0]
     Rotate by Rz(raan) * Rx(inc) * Rz(argp)
     """
+    # semi-latus rectum; perifocal_to_eci computes r from nu
+    p = a_km * (1 - e*e)
+    R = build_rotation(inc_deg, raan_deg, argp_deg)
+    return perifocal_to_eci(R, nu_rad, p, e)
+
+@lru_cache(maxsize=1024)
+def build_rotation(inc_deg: float, raan_deg: float, argp_deg: float) -> np.ndarray:
+    """
+    Perifocal -> ECI rotation matrix R = Rz(raan) * Rx(inc) * Rz(argp), shape (3, 3).
+    Cached per angle triple, so the matrix is returned read-only.
+    """
     inc = math.radians(inc_deg)
     raan = math.radians(raan_deg)
     argp = math.radians(argp_deg)
-    r = a_km * (1 - e*math.cos(newtonm(e, 0)[0]))  # not used here; we'll compute r from nu
-    # compute radius using standard formula
-    p = a_km * (1 - e*e)
-    r_km = p / (1.0 + e * math.cos(nu_rad))
-    # perifocal coords
-    x_pf = r_km * math.cos(nu_rad)
-    y_pf = r_km * math.sin(nu_rad)
-    z_pf = 0.0
-    # rotation matrices
-    # R = Rz(raan) * Rx(inc) * Rz(argp)
     cos_raan = math.cos(raan); sin_raan = math.sin(raan)
     cos_inc = math.cos(inc); sin_inc = math.sin(inc)
     cos_argp = math.cos(argp); sin_argp = math.sin(argp)
-    # Combined rotation matrix elements
-    R11 = cos_raan * cos_argp - sin_raan * sin_argp * cos_inc
-    R12 = -cos_raan * sin_argp - sin_raan * cos_argp * cos_inc
-    R13 = sin_raan * sin_inc
-    R21 = sin_raan * cos_argp + cos_raan * sin_argp * cos_inc
-    R22 = -sin_raan * sin_argp + cos_raan * cos_argp * cos_inc
-    R23 = -cos_raan * sin_inc
-    R31 = sin_argp * sin_inc
-    R32 = cos_argp * sin_inc
-    R33 = cos_inc
-    # ECI coords
-    x = R11 * x_pf + R12 * y_pf + R13 * z_pf
-    y = R21 * x_pf + R22 * y_pf + R23 * z_pf
-    z = R31 * x_pf + R32 * y_pf + R33 * z_pf
+    R = np.array([
+        [cos_raan * cos_argp - sin_raan * sin_argp * cos_inc,
+         -cos_raan * sin_argp - sin_raan * cos_argp * cos_inc,
+         sin_raan * sin_inc],
+        [sin_raan * cos_argp + cos_raan * sin_argp * cos_inc,
+         -sin_raan * sin_argp + cos_raan * cos_argp * cos_inc,
+         -cos_raan * sin_inc],
+        [sin_argp * sin_inc,
+         cos_argp * sin_inc,
+         cos_inc],
+    ])
+    R.setflags(write=False)
+    return R
+
+def perifocal_to_eci(R: np.ndarray, nu_rad, p_km: float, e: float):
+    """
+    Position at true anomaly nu_rad on the conic with semi-latus rectum p_km,
+    rotated to ECI by R (from build_rotation). nu_rad may be a scalar or array.
+    Returns x, y, z (km).
+    """
+    cos_nu = np.cos(nu_rad); sin_nu = np.sin(nu_rad)
+    r_km = p_km / (1.0 + e * cos_nu)
+    # perifocal coords; z_pf = 0, so the third column of R drops out
+    x_pf = r_km * cos_nu
+    y_pf = r_km * sin_nu
+    x = R[0, 0] * x_pf + R[0, 1] * y_pf
+    y = R[1, 0] * x_pf + R[1, 1] * y_pf
+    z = R[2, 0] * x_pf + R[2, 1] * y_pf
     return x, y, z
 
+def sincosE_to_eci(a_km: float, e: float, R: np.ndarray, sinE: np.ndarray, cosE: np.ndarray) -> np.ndarray:
+    """
+    ECI positions (N, 3) in km from sin/cos of the eccentric anomaly, with no
+    true anomaly in between: perifocal a*(cosE - e, sqrt(1-e^2)*sinE, 0) rotated by R.
+    """
+    pq = np.column_stack([a_km * (cosE - e), a_km * math.sqrt(1.0 - e*e) * sinE])
+    # one rotation matrix for all epochs, applied as a single matmul;
+    # the perifocal z is always 0, so only the first two columns of R contribute
+    return pq @ R[:, :2].T
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _kepler_xy(a_km, b_km, e, M):
+    """
+    Perifocal (x, y) in km at mean anomaly M (radians, in [0, 2pi)):
+    Newton solve for E, then a*(cosE - e), b*sinE with b = a*sqrt(1-e^2).
+    """
+    if e < CIRCULAR_ECC:
+        # circular: no Kepler solve
+        return a_km * np.cos(M), a_km * np.sin(M)
+    if e < 0.1:
+        # third-order series in e (error ~e^4 <= 1e-4), so two Newton steps
+        # reach ~1e-12 and the step count is fixed for typical LEO orbits
+        sinM = np.sin(M)
+        cosM = np.cos(M)
+        E = M + e * sinM * (1.0 + e * cosM + 0.5 * e * e * (3.0 * cosM * cosM - 1.0))
+        steps = 2
+    elif e < 0.8:
+        # same starters as eccentric_anomaly_vec
+        E = M + e * np.sin(M)
+        steps = 30
+    else:
+        E = M + 0.85 * e * np.copysign(1.0, np.sin(M))
+        steps = 30
+    # one sin/cos pair of the same argument per step (LLVM fuses it into sincos)
+    for _ in range(steps):
+        sinE = np.sin(E)
+        cosE = np.cos(E)
+        dE = (E - e * sinE - M) / (1.0 - e * cosE)
+        E -= dE
+        if abs(dE) < 1e-12:
+            break
+    # carry the last pair to the final E to first order (error ~dE^2)
+    sinE, cosE = sinE - cosE * dE, cosE + sinE * dE
+    return a_km * (cosE - e), b_km * sinE
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _propagate_kernel(a_km, e, R, M0, n_rad_s, dt, out):
+    """
+    Compiled exact propagation: mean anomaly, Newton solve, perifocal position
+    and rotation by R fused into one pass over dt, written into out (N, 3) in km.
+    The math is float64 throughout; out may be float32 (compiled per out dtype).
+    """
+    b_km = a_km * np.sqrt(1.0 - e*e)
+    for i in range(dt.shape[0]):
+        x_pf, y_pf = _kepler_xy(a_km, b_km, e, (M0 + n_rad_s * dt[i]) % _TWO_PI)
+        out[i, 0] = R[0, 0] * x_pf + R[0, 1] * y_pf
+        out[i, 1] = R[1, 0] * x_pf + R[1, 1] * y_pf
+        out[i, 2] = R[2, 0] * x_pf + R[2, 1] * y_pf
+    return out
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _propagate_grid_kernel(a_km, e, R, M0, n_rad_s, dt, SINE, COSE, m_scale, e0, e_scale, out):
+    """
+    Like _propagate_kernel, but (sin E, cos E) are bilinearly interpolated from
+    the kepler_grid tables instead of solved. Plotting-grade (~tens of metres).
+    """
+    b_km = a_km * np.sqrt(1.0 - e*e)
+    for j in range(dt.shape[0]):
+        M = (M0 + n_rad_s * dt[j]) % _TWO_PI
+        sinE, cosE = grid_sincosE(SINE, COSE, M, e, m_scale, e0, e_scale)
+        x_pf = a_km * (cosE - e)
+        y_pf = b_km * sinE
+        out[j, 0] = R[0, 0] * x_pf + R[0, 1] * y_pf
+        out[j, 1] = R[1, 0] * x_pf + R[1, 1] * y_pf
+        out[j, 2] = R[2, 0] * x_pf + R[2, 1] * y_pf
+    return out
+
+@njit(cache=True, parallel=True, nogil=True)
+def _propagate_many_kernel(a_km, e, R, M0, n_rad_s, dt, out):
+    """
+    _propagate_kernel for K satellites, threaded over satellites with prange.
+    Element arrays have shape (K,), R is (K, 3, 3), out is (K, N, 3).
+    """
+    for k in prange(a_km.shape[0]):
+        _propagate_kernel(a_km[k], e[k], R[k], M0[k], n_rad_s[k], dt, out[k])
+    return out
+
+@njit(cache=True, parallel=True, nogil=True)
+def _propagate_many_grid_kernel(a_km, e, R, M0, n_rad_s, dt, SINE, COSE, m_scale, e0, e_scale, out):
+    """
+    _propagate_grid_kernel for K satellites, threaded over satellites with prange.
+    """
+    for k in prange(a_km.shape[0]):
+        _propagate_grid_kernel(a_km[k], e[k], R[k], M0[k], n_rad_s[k], dt,
+                               SINE, COSE, m_scale, e0, e_scale, out[k])
+    return out
+
 def propagate_kepler(a_km: float, e: float, inc_deg: float, raan_deg: float, argp_deg: float,
                      mean_anom_deg: float, mean_motion_rev_per_day: float,
-                     times_seconds_from_epoch: List[float]) -> Tuple[List[float], List[float], List[float]]:
+                     times_seconds_from_epoch: np.ndarray,
+                     use_lut: bool = False, dtype: str = "float64") -> np.ndarray:
     """
     Propagate orbit at given times (seconds from epoch) using simple Keplerian motion.
-    Returns lists of x,y,z coordinates (km).
+    The exact path runs the compiled _propagate_kernel; with use_lut, E is
+    interpolated from a per-eccentricity lookup table in NumPy instead.
+    The kernel is serial and releases the GIL, so concurrent calls from a
+    thread pool (e.g. one per request in a server) run in parallel.
+    dtype="float32" halves the output for plotting; the math stays float64
+    (float32 time/anomaly would cost ~km at month-long spans).
+    Returns an (N, 3) array of x,y,z coordinates (km), one row per epoch.
     """
     n_rad_s = mean_motion_revday_to_rad_s(mean_motion_rev_per_day)
     # initial mean anomaly (radians)
     M0 = math.radians(mean_anom_deg)
-    xs, ys, zs = [], [], []
-    for dt in times_seconds_from_epoch:
-        M = (M0 + n_rad_s * dt) % (2.0 * math.pi)
-        E, nu = newtonm(e, M)
-        x, y, z = kepler_to_eci(a_km, e, inc_deg, raan_deg, argp_deg, nu)
-        xs.append(x); ys.append(y); zs.append(z)
-    return xs, ys, zs
+    dt = np.asarray(times_seconds_from_epoch, dtype=np.float64)
+    R = build_rotation(inc_deg, raan_deg, argp_deg)
+    if not use_lut:
+        return _propagate_kernel(a_km, e, R, M0, n_rad_s, dt, np.empty((len(dt), 3), dtype=dtype))
+
+    M = (M0 + n_rad_s * dt) % _TWO_PI
+    E = M if e < CIRCULAR_ECC else solve_E_lut(M, *build_E_table(e))
+    return sincosE_to_eci(a_km, e, R, np.sin(E), np.cos(E)).astype(dtype, copy=False)
+
+def propagate_many(tles: np.ndarray, times_seconds_from_epoch: np.ndarray,
+                   dtype: str = "float64") -> np.ndarray:
+    """
+    Propagate several satellites over the same times (seconds from epoch).
+    tles: structured array of TLE_DTYPE rows (see tle_parser.parse_tle_records).
+    Satellites run in parallel threads inside one compiled kernel (no pickling);
+    concurrent propagate_many calls take turns, since that kernel already uses every core.
+    For large ensembles (> GRID_THRESHOLD samples, all e <= GRID_MAX_ECC)
+    E is interpolated from the kepler_grid tables instead of solved.
+    dtype sets the output precision as in propagate_kepler.
+    Returns a (K, N, 3) array of positions in km, row k for tles[k]
+    (names need not be unique, e.g. two epochs of one object).
+    """
+    dt = np.asarray(times_seconds_from_epoch, dtype=np.float64)
+    a_km = np.ascontiguousarray(tles["sma"])
+    e = np.ascontiguousarray(tles["ecc"])
+    M0 = np.radians(tles["mean_anom"])
+    n_rad_s = mean_motion_revday_to_rad_s(tles["mean_motion"])
+    # filled in place rather than stacked from a list of (3, 3) arrays
+    R = np.empty((len(tles), 3, 3))
+    for k, (inc, raan, argp) in enumerate(zip(tles["inc"], tles["raan"], tles["argp"])):
+        R[k] = build_rotation(inc, raan, argp)
+    out = np.empty((len(tles), len(dt), 3), dtype=dtype)
+
+    with _PARALLEL_LOCK:
+        if len(tles) * len(dt) > GRID_THRESHOLD and np.all(e <= GRID_MAX_ECC):
+            SINE, COSE = grid_tables()
+            m_scale = (len(M_GRID) - 1) / (M_GRID[-1] - M_GRID[0])
+            e_scale = (len(ECC_GRID) - 1) / (ECC_GRID[-1] - ECC_GRID[0])
+            _propagate_many_grid_kernel(a_km, e, R, M0, n_rad_s, dt,
+                                        SINE, COSE, m_scale, ECC_GRID[0], e_scale, out)
+        else:
+            _propagate_many_kernel(a_km, e, R, M0, n_rad_s, dt, out)
+    return out
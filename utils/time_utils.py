@@ -2,6 +2,8 @@
 from datetime import datetime, timezone, timedelta
 from typing import List
 
+import numpy as np
+
 def parse_epoch(year: int, day_of_year: float) -> datetime:
     """
     Convert TLE epoch (year, day_of_year) to timezone-aware UTC datetime.
@@ -10,10 +12,27 @@ def parse_epoch(year: int, day_of_year: float) -> datetime:
     base = datetime(year, 1, 1, tzinfo=timezone.utc)
     return base + timedelta(days=day_of_year - 1)
 
-def build_time_array(start_dt: datetime, numdays: int, sample_seconds: int):
+def build_time_array(start_dt, numdays: int, sample_seconds: int) -> np.ndarray:
+    """
+    Build a datetime64[ns] array from start_dt to start_dt + numdays at given interval.
+    start_dt may be a np.datetime64 or a datetime (e.g. from parse_epoch);
+    aware datetimes are converted to UTC first.
+    """
+    if isinstance(start_dt, datetime) and start_dt.tzinfo is not None:
+        start_dt = start_dt.astimezone(timezone.utc).replace(tzinfo=None)
+    start = np.datetime64(start_dt, "ns")
+    total_seconds = int(numdays * 24 * 3600)
+    steps = max(2, total_seconds // sample_seconds + 1)
+    # one int64 arange, no Python datetime per sample; the step is in ns so
+    # fractional sample_seconds work (as in build_time_seconds)
+    step = np.timedelta64(int(round(sample_seconds * 1e9)), "ns")
+    return start + np.arange(steps, dtype=np.int64) * step
+
+def build_time_seconds(numdays: float, sample_seconds: int) -> np.ndarray:
     """
-    Build a list of datetimes from start_dt to start_dt + numdays at given interval.
+    Seconds from start for the same samples as build_time_array, as a float64
+    array (what propagate_kepler consumes); no datetime objects are built.
     """
     total_seconds = int(numdays * 24 * 3600)
     steps = max(2, total_seconds // sample_seconds + 1)
-    return [start_dt + timedelta(seconds=i*sample_seconds) for i in range(steps)]
+    return np.arange(steps, dtype=np.float64) * sample_seconds
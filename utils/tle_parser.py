@@ -1,35 +1,78 @@
 # utils/tle_parser.py
 import math
+import struct
+from collections import deque
+from functools import lru_cache
 from typing import List, Tuple, Dict
 
+import numpy as np
+
+# Fixed-column TLE layouts (0-indexed), unpacked in one call per line
+# line 1: satnum [2:7], epoch year [18:20], epoch day [20:32]
+_LINE1 = struct.Struct("2x5s11x2s12s")
+# line 2: inc [8:16], raan [17:25], ecc [26:33], argp [34:42], mean anomaly [43:51], mean motion [52:63]
+_LINE2 = struct.Struct("8x8sx8sx7sx8sx8sx11s")
+
+# One row per satellite; columns are contiguous arrays for batch propagation.
+# "name" is the default width; parse_tle_records widens it to the longest name.
+TLE_DTYPE = np.dtype([
+    ("name", "U24"),
+    ("satnum", "U5"),
+    ("epoch_year", "i4"),
+    ("epoch_day", "f8"),
+    ("inc", "f8"),
+    ("raan", "f8"),
+    ("ecc", "f8"),
+    ("argp", "f8"),
+    ("mean_anom", "f8"),
+    ("mean_motion", "f8"),
+    ("sma", "f8"),
+])
+
+# parse_tle dict keys, in the order _parse_tle_fields returns the values
+_TLE_KEYS = ("satnum", "epoch_year", "epoch_day", "inclination", "raan", "eccentricity",
+             "argp", "mean_anom", "mean_motion_rev_per_day", "sma_km")
+
 def parse_tle(line1: str, line2: str) -> Dict:
     """
     Parse a single 2-line TLE pair (line1, line2) and return a dictionary
     of orbital parameters (numbers) similar to MATLAB tleread outputs.
     - Expects character positions per standard TLE format.
+    Parsed fields are cached per (line1, line2); each call gets its own dict.
+    """
+    return dict(zip(_TLE_KEYS, _parse_tle_fields(line1, line2)))
+
+
+@lru_cache(maxsize=4096)
+def _parse_tle_fields(line1: str, line2: str) -> Tuple:
+    """
+    Field values for parse_tle as an (immutable, cacheable) tuple in _TLE_KEYS order.
     """
     # sanitize
     l1 = line1.rstrip("\n")
     l2 = line2.rstrip("\n")
 
-    satnum = l1[2:7].strip()
+    satnum_b, year_b, day_b = _LINE1.unpack_from(l1.encode("ascii"))
+    inc_b, raan_b, ecc_b, argp_b, manom_b, mmotion_b = _LINE2.unpack_from(l2.encode("ascii"))
+
+    satnum = satnum_b.strip().decode("ascii")
 
     # epoch
-    epoch_year = int(l1[18:20])
-    epoch_day = float(l1[20:32])
+    epoch_year = int(year_b)
+    epoch_day = float(day_b)
 
     if epoch_year < 57:
         epoch_year += 2000
     else:
         epoch_year += 1900
 
-    # line2 fields by fixed columns (1-indexed spec -> convert to 0-index)
-    inc = float(l2[8:16])                    # inclination (deg)
-    raan = float(l2[17:25])                  # RAAN (deg)
-    ecc = float("0." + l2[26:33].strip())    # eccentricity (no decimal in TLE)
-    argp = float(l2[34:42])                  # argument of perigee (deg)
-    mean_anom = float(l2[43:51])             # mean anomaly (deg)
-    mean_motion = float(l2[52:63])           # revs per day
+    # line2 fields (columns in _LINE2)
+    inc = float(inc_b)                       # inclination (deg)
+    raan = float(raan_b)                     # RAAN (deg)
+    ecc = float(b"0." + ecc_b.strip())       # eccentricity (no decimal in TLE)
+    argp = float(argp_b)                     # argument of perigee (deg)
+    mean_anom = float(manom_b)               # mean anomaly (deg)
+    mean_motion = float(mmotion_b)           # revs per day
 
     # semi-major axis (km) from mean motion (revs/day)
     # n (rad/s) = mean_motion * 2*pi / 86400
@@ -37,21 +80,7 @@ def parse_tle(line1: str, line2: str) -> Dict:
     n_rad_s = mean_motion * 2.0 * math.pi / 86400.0
     sma = (mu / (n_rad_s**2)) ** (1.0/3.0)
 
-    # Build a TLE-like struct/dict for display
-    tle_struct = {
-        "satnum": satnum,
-        "epoch_year": epoch_year,
-        "epoch_day": epoch_day,
-        "inclination": inc,
-        "raan": raan,
-        "eccentricity": ecc,
-        "argp": argp,
-        "mean_anom": mean_anom,
-        "mean_motion_rev_per_day": mean_motion,
-        "sma_km": sma
-    }
-
-    return tle_struct
+    return (satnum, epoch_year, epoch_day, inc, raan, ecc, argp, mean_anom, mean_motion, sma)
 
 
 def parse_tle_lines(text: str) -> List[Tuple[str, str, str]]:
@@ -59,29 +88,40 @@ def parse_tle_lines(text: str) -> List[Tuple[str, str, str]]:
     Parse raw TLE text (may contain many TLEs).
     Returns list of (name, line1, line2). Name may be generated if not present.
     """
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip() != ""]
     sats = []
-    i = 0
-    while i < len(lines) - 1:
-        # pattern: name + line1 + line2
-        if (i + 2 < len(lines)) and lines[i+1].startswith("1 ") and lines[i+2].startswith("2 "):
-            name = lines[i]
-            l1 = lines[i+1]
-            l2 = lines[i+2]
-            i += 3
-        # pattern: line1 + line2
-        elif lines[i].startswith("1 ") and lines[i+1].startswith("2 "):
-            name = f"SAT_{len(sats)+1}"
-            l1 = lines[i]
-            l2 = lines[i+1]
-            i += 2
-        else:
-            i += 1
+    # at most the two latest unconsumed lines: a possible name and a possible line 1
+    pending = deque(maxlen=2)
+    for raw in text.splitlines():
+        ln = raw.strip()
+        if not ln:
             continue
-        sats.append((name, l1, l2))
+        if ln.startswith("2 ") and pending and pending[-1].startswith("1 "):
+            # pattern: name + line1 + line2, or bare line1 + line2
+            name = pending[0] if len(pending) == 2 else f"SAT_{len(sats)+1}"
+            sats.append((name, pending[-1], ln))
+            pending.clear()
+        else:
+            pending.append(ln)
     return sats
 
 
+def parse_tle_records(text: str) -> np.ndarray:
+    """
+    Parse raw TLE text into a structured array of TLE_DTYPE (one row per
+    satellite), so each element is a column ready for broadcast propagation.
+    The name column is sized to the longest name, so none are truncated.
+    """
+    sats = parse_tle_lines(text)
+    # never narrower than TLE_DTYPE's (itemsize is 4 bytes per UCS4 char)
+    name_width = max([TLE_DTYPE["name"].itemsize // 4] + [len(name) for name, _, _ in sats])
+    dtype = np.dtype([("name", f"U{name_width}")] + TLE_DTYPE.descr[1:])
+    out = np.empty(len(sats), dtype=dtype)
+    for i, (name, l1, l2) in enumerate(sats):
+        # the field tuple is already in TLE_DTYPE column order after name
+        out[i] = (name,) + _parse_tle_fields(l1, l2)
+    return out
+
+
 def parse_tle_file(path: str):
     with open(path, "r", encoding="utf-8") as f:
         txt = f.read()